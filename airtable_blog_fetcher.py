@@ -6,14 +6,22 @@ Fetches blog posts from Airtable that are due within the next 7 days.
 
 import os
 import requests
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+import requests_cache
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter, Retry
+from datetime import date, datetime, timedelta
+from typing import Iterator, List, Dict, Optional
 from dotenv import load_dotenv
-import json
+from diskcache import Cache
+import orjson
 
 # Load environment variables
 load_dotenv()
 
+# Memoized fetch results, keyed by base/table/date window. Complements the
+# HTTP-level cache: a hit here skips pagination and record processing too.
+_result_cache = Cache('.airtable_cache')
+
 
 class AirtableBlogFetcher:
     """Handles connection to Airtable and fetching of blog posts."""
@@ -23,16 +31,45 @@ class AirtableBlogFetcher:
         self.api_key = os.getenv('AIRTABLE_API_KEY')
         self.base_id = os.getenv('AIRTABLE_BASE_ID')
         self.table_name = os.getenv('AIRTABLE_TABLE_NAME', 'Blog Posts')
-        
+        self.due_date_field = os.getenv('AIRTABLE_DUE_DATE_FIELD', 'Due Date')
+        # Optional formula field (DATETIME_DIFF({Due Date}, TODAY(), 'days'))
+        # letting Airtable compute days-until-due server-side so we skip the
+        # per-record date parsing below.
+        self.days_until_due_field = os.getenv('AIRTABLE_DAYS_UNTIL_DUE_FIELD')
+
         if not self.api_key or not self.base_id:
             raise ValueError("Missing required environment variables: AIRTABLE_API_KEY and AIRTABLE_BASE_ID")
         
         self.headers = {
             'Authorization': f'Bearer {self.api_key}',
-            'Content-Type': 'application/json'
+            'Content-Type': 'application/json',
+            # requests decompresses transparently; this just shrinks the wire payload
+            'Accept-Encoding': 'gzip, deflate'
         }
         
         self.base_url = f'https://api.airtable.com/v0/{self.base_id}/{self.table_name}'
+
+        # Cache GET responses locally so repeated runs within a few minutes
+        # don't re-hit the Airtable API. cache_control=True makes expired
+        # entries revalidate with Airtable's ETags (a 304 skips the body).
+        self.session = requests_cache.CachedSession(
+            'airtable_cache',
+            backend='sqlite',
+            expire_after=300,
+            cache_control=True,
+            allowable_methods=['GET']
+        )
+        self.session.headers.update(self.headers)
+
+        # Keep-alive pooling avoids a fresh TLS handshake per page, and the
+        # Retry policy backs off on 429s (honoring Retry-After) and 5xx errors.
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
     
     def get_posts_due_this_week(self) -> List[Dict]:
         """
@@ -48,48 +85,106 @@ class AirtableBlogFetcher:
         # Format dates for Airtable (ISO 8601)
         today_str = today.isoformat()
         week_str = week_from_now.isoformat()
+
+        # Same window fetched within the last 15 minutes? Reuse the
+        # already-processed result.
+        cache_key = (self.base_id, self.table_name, today_str, week_str)
+        cached = _result_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Build the filter formula
         # Adjust field name based on your Airtable schema
-        due_date_field = os.getenv('AIRTABLE_DUE_DATE_FIELD', 'Due Date')
+        due_date_field = self.due_date_field
         filter_formula = f"AND(IS_AFTER({{{due_date_field}}}, '{today_str}'), IS_BEFORE({{{due_date_field}}}, '{week_str}'))"
         
         # Alternative formula if you want to include today's posts:
         # filter_formula = f"AND(NOT({{{due_date_field}}} < '{today_str}'), {{{due_date_field}}} <= '{week_str}')"
         
-        params = {
-            'filterByFormula': filter_formula,
-            'sort[0][field]': due_date_field,
-            'sort[0][direction]': 'asc'
-        }
-        
+        # Built as a list of tuples so the repeated fields[] keys URL-encode
+        # correctly; only the columns _process_records reads are requested.
+        wanted_fields = ['Title', 'Status', 'Author', 'Category', 'Notes',
+                         'Word Count Target', 'Priority', due_date_field]
+        if self.days_until_due_field:
+            wanted_fields.append(self.days_until_due_field)
+
+        params = [
+            ('filterByFormula', filter_formula),
+            ('sort[0][field]', due_date_field),
+            ('sort[0][direction]', 'asc')
+        ]
+        params.extend(('fields[]', name) for name in wanted_fields)
+
+        # Send the last ETag we saw for this window; an unchanged table
+        # answers 304 with no body, so there's nothing to parse or process.
+        stored_etag = _result_cache.get(('etag', cache_key))
+        last_result = _result_cache.get(('etag-result', cache_key))
+        first_headers = {}
+        if stored_etag and last_result is not None:
+            first_headers['If-None-Match'] = stored_etag
+
         try:
-            response = requests.get(self.base_url, headers=self.headers, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            records = data.get('records', [])
-            
-            return self._process_records(records)
-            
+            # Airtable caps responses at 100 records per page and returns an
+            # 'offset' cursor when more pages remain; loop until it's absent.
+            # Each page's cursor only arrives in its response body, so pages
+            # can't be fetched in parallel — instead a single worker thread
+            # downloads page k+1 while page k's records are being processed.
+            posts = []
+            etag = None
+            first_page = True
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                future = pool.submit(self.session.get, self.base_url,
+                                     params=params, headers=first_headers)
+                while future is not None:
+                    response = future.result()
+
+                    if first_page:
+                        if response.status_code == 304:
+                            return last_result
+                        etag = response.headers.get('ETag')
+                        first_page = False
+
+                    response.raise_for_status()
+                    # orjson decodes the raw bytes several times faster than
+                    # requests' built-in .json() path
+                    data = orjson.loads(response.content)
+
+                    if 'offset' in data:
+                        next_params = params + [('offset', data['offset'])]
+                        future = pool.submit(self.session.get, self.base_url,
+                                             params=next_params)
+                    else:
+                        future = None
+
+                    posts.extend(self._process_records(data.get('records', [])))
+
+            _result_cache.set(cache_key, posts, expire=900)
+            if etag:
+                # Validator entries have no TTL — they stay good until the
+                # table actually changes
+                _result_cache.set(('etag', cache_key), etag)
+                _result_cache.set(('etag-result', cache_key), posts)
+            return posts
+
         except requests.exceptions.RequestException as e:
             print(f"Error fetching data from Airtable: {e}")
             if hasattr(e.response, 'text'):
                 print(f"Response: {e.response.text}")
             return []
     
-    def _process_records(self, records: List[Dict]) -> List[Dict]:
+    def _process_records(self, records: List[Dict]) -> Iterator[Dict]:
         """
         Process and format the raw Airtable records.
-        
+
         Args:
             records: Raw records from Airtable API
-            
-        Returns:
-            Processed list of blog post data
+
+        Yields:
+            Processed blog post data, one record at a time
         """
-        processed_posts = []
-        
+        # One clock/timezone lookup for the whole batch, not one per record
+        today = datetime.now().date()
+
         for record in records:
             fields = record.get('fields', {})
             
@@ -97,7 +192,7 @@ class AirtableBlogFetcher:
             post_data = {
                 'id': record.get('id'),
                 'title': fields.get('Title', 'Untitled'),
-                'due_date': fields.get(os.getenv('AIRTABLE_DUE_DATE_FIELD', 'Due Date')),
+                'due_date': fields.get(self.due_date_field),
                 'status': fields.get('Status', 'Not Started'),
                 'author': fields.get('Author', 'Unassigned'),
                 'category': fields.get('Category', ''),
@@ -106,27 +201,39 @@ class AirtableBlogFetcher:
                 'priority': fields.get('Priority', 'Medium')
             }
             
-            # Calculate days until due
-            if post_data['due_date']:
-                due_date = datetime.fromisoformat(post_data['due_date']).date()
-                days_until_due = (due_date - datetime.now().date()).days
-                post_data['days_until_due'] = days_until_due
-            
-            processed_posts.append(post_data)
-        
-        return processed_posts
+            # Prefer the Airtable-computed value when the formula field is
+            # configured; otherwise fall back to computing it locally.
+            days_until_due = None
+            if self.days_until_due_field:
+                days_until_due = fields.get(self.days_until_due_field)
+
+            if days_until_due is not None:
+                post_data['days_until_due'] = int(days_until_due)
+            elif post_data['due_date']:
+                # date.fromisoformat skips the throwaway datetime; the slice
+                # handles Airtable date fields that include a time component
+                due_date = date.fromisoformat(post_data['due_date'][:10])
+                post_data['days_until_due'] = (due_date - today).days
+
+            yield post_data
     
-    def display_posts(self, posts: List[Dict]) -> None:
+    def display_posts(self, posts: List[Dict], quiet: bool = False) -> None:
         """
         Display the fetched blog posts in a formatted manner.
-        
+
         Args:
             posts: List of processed blog post data
+            quiet: If True, print only a one-line summary — the full
+                per-post formatting is wasted work when stdout is a log file
         """
         if not posts:
             print("No blog posts due this week.")
             return
-        
+
+        if quiet:
+            print(f"📝 {len(posts)} blog posts due this week")
+            return
+
         print(f"\n📝 Blog Posts Due This Week ({len(posts)} total)")
         print("=" * 60)
         
@@ -148,17 +255,25 @@ class AirtableBlogFetcher:
         
         print("\n" + "=" * 60)
     
-    def export_to_json(self, posts: List[Dict], filename: str = "blog_posts_due.json") -> None:
+    def export_to_json(self, posts: List[Dict], filename: str = "blog_posts_due.json",
+                       format: str = "json") -> None:
         """
         Export the fetched posts to a JSON file.
-        
+
         Args:
             posts: List of processed blog post data
             filename: Output filename
+            format: 'json' for one indented document, 'ndjson' for one record
+                per line — constant memory and stream-friendly for consumers
         """
-        with open(filename, 'w') as f:
-            json.dump(posts, f, indent=2, default=str)
-        
+        with open(filename, 'wb') as f:
+            if format == 'ndjson':
+                for post in posts:
+                    f.write(orjson.dumps(post, default=str))
+                    f.write(b'\n')
+            else:
+                f.write(orjson.dumps(posts, option=orjson.OPT_INDENT_2, default=str))
+
         print(f"✅ Exported {len(posts)} posts to {filename}")
 
 
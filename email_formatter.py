@@ -3,267 +3,141 @@
 Format blog posts for email delivery - creates both HTML and plain text versions.
 """
 
-import json
+import functools
+import os
+import orjson
+import jinja2
 from datetime import datetime
-from collections import defaultdict
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
+from itertools import groupby
+from operator import itemgetter
+from email.message import EmailMessage
+
+# Compile the HTML template once at import; auto_reload=False skips the
+# per-render mtime check, and autoescape handles post fields safely.
+_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+_env = jinja2.Environment(
+    loader=jinja2.FileSystemLoader(_TEMPLATE_DIR),
+    autoescape=True,
+    auto_reload=False
+)
+_HTML_TEMPLATE = _env.get_template('email.html.j2')
+
+
+@functools.lru_cache(maxsize=64)
+def _format_due_date(iso_date):
+    """Locale-aware strftime is slow; many posts share few distinct dates."""
+    return datetime.fromisoformat(iso_date).strftime('%A, %B %d, %Y')
 
 def load_blog_posts(filename="blog_posts_due.json"):
-    """Load blog posts from JSON file."""
-    with open(filename, 'r') as f:
-        return json.load(f)
+    """Load blog posts from a JSON or newline-delimited JSON export."""
+    with open(filename, 'rb') as f:
+        first = f.read(1)
+        f.seek(0)
+        if first == b'[':
+            return orjson.loads(f.read())
+        # ndjson export: parse record by record instead of one big document
+        return [orjson.loads(line) for line in f if line.strip()]
 
 def create_html_email(posts):
-    """Create HTML formatted email content."""
-    # Group posts by date
-    posts_by_date = defaultdict(list)
-    for post in posts:
-        posts_by_date[post['due_date']].append(post)
-    
-    # Count statistics
-    total_posts = len(posts)
-    urgent_posts = len([p for p in posts if p['days_until_due'] <= 2])
-    not_started = len([p for p in posts if p['status'] == 'Not Started'])
-    
-    html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-                line-height: 1.6;
-                color: #333;
-                max-width: 800px;
-                margin: 0 auto;
-                padding: 20px;
-            }
-            h1 {
-                color: #2c3e50;
-                border-bottom: 3px solid #3498db;
-                padding-bottom: 10px;
-            }
-            h2 {
-                color: #34495e;
-                margin-top: 30px;
-                background: #ecf0f1;
-                padding: 10px;
-                border-left: 4px solid #3498db;
-            }
-            .stats {
-                background: #f8f9fa;
-                border: 1px solid #dee2e6;
-                border-radius: 5px;
-                padding: 15px;
-                margin: 20px 0;
-            }
-            .stat-item {
-                display: inline-block;
-                margin-right: 30px;
-                font-size: 16px;
-            }
-            .stat-number {
-                font-size: 24px;
-                font-weight: bold;
-                color: #3498db;
-            }
-            .post-card {
-                background: white;
-                border: 1px solid #e1e4e8;
-                border-radius: 5px;
-                padding: 15px;
-                margin: 10px 0;
-                box-shadow: 0 1px 3px rgba(0,0,0,0.1);
-            }
-            .post-title {
-                font-size: 18px;
-                font-weight: bold;
-                color: #2c3e50;
-                margin-bottom: 10px;
-            }
-            .post-meta {
-                font-size: 14px;
-                color: #666;
-                line-height: 1.8;
-            }
-            .urgent {
-                background: #fff3cd;
-                border-color: #ffc107;
-            }
-            .label {
-                display: inline-block;
-                padding: 2px 8px;
-                border-radius: 3px;
-                font-size: 12px;
-                font-weight: bold;
-                text-transform: uppercase;
-                margin-right: 5px;
-            }
-            .label-urgent {
-                background: #dc3545;
-                color: white;
-            }
-            .label-soon {
-                background: #ffc107;
-                color: #333;
-            }
-            .label-medium {
-                background: #6c757d;
-                color: white;
-            }
-            .footer {
-                margin-top: 40px;
-                padding-top: 20px;
-                border-top: 1px solid #dee2e6;
-                font-size: 12px;
-                color: #6c757d;
-                text-align: center;
-            }
-        </style>
-    </head>
-    <body>
-    """
-    
-    # Header
-    html += f"""
-        <h1>📝 Weekly Blog Post Schedule</h1>
-        <p><strong>Report Generated:</strong> {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
-        
-        <div class="stats">
-            <div class="stat-item">
-                <div class="stat-number">{total_posts}</div>
-                <div>Total Posts Due</div>
-            </div>
-            <div class="stat-item">
-                <div class="stat-number" style="color: #dc3545;">{urgent_posts}</div>
-                <div>Urgent (≤2 days)</div>
-            </div>
-            <div class="stat-item">
-                <div class="stat-number" style="color: #ffc107;">{not_started}</div>
-                <div>Not Started</div>
-            </div>
-        </div>
-    """
-    
-    # Posts by date
-    for date in sorted(posts_by_date.keys()):
+    """Create HTML formatted email content by rendering the compiled template."""
+    # Posts arrive sorted by due date (the Airtable query sorts, and ISO
+    # date strings keep chronological order through the JSON round-trip),
+    # so group adjacent runs with groupby — no hashing, no key re-sort.
+    today = datetime.now().date()
+    urgent_posts = not_started = 0
+    groups = []
+    for date, group in groupby(posts, key=itemgetter('due_date')):
+        date_posts = list(group)
+        for post in date_posts:
+            if post['days_until_due'] <= 2:
+                urgent_posts += 1
+            if post['status'] == 'Not Started':
+                not_started += 1
+
         due_date = datetime.fromisoformat(date)
-        date_str = due_date.strftime('%A, %B %d, %Y')
-        
-        # Calculate urgency
-        days_until = (due_date.date() - datetime.now().date()).days
-        
-        html += f'<h2>{date_str}'
-        if days_until <= 1:
-            html += ' <span class="label label-urgent">URGENT</span>'
-        elif days_until <= 2:
-            html += ' <span class="label label-soon">DUE SOON</span>'
-        html += '</h2>\n'
-        
-        for post in posts_by_date[date]:
-            card_class = 'post-card urgent' if post['days_until_due'] <= 2 else 'post-card'
-            
-            html += f'<div class="{card_class}">\n'
-            html += f'  <div class="post-title">{post["title"]}</div>\n'
-            html += '  <div class="post-meta">\n'
-            html += f'    <strong>Status:</strong> {post["status"]} | '
-            html += f'    <strong>Priority:</strong> {post["priority"]} | '
-            html += f'    <strong>Days Until Due:</strong> {post["days_until_due"]}<br>\n'
-            
-            if post['author'] != 'Unassigned':
-                html += f'    <strong>Author:</strong> {post["author"]}<br>\n'
-            
-            if post['category']:
-                html += f'    <strong>Category:</strong> {post["category"]}<br>\n'
-            
-            if post['word_count_target']:
-                html += f'    <strong>Target Word Count:</strong> {post["word_count_target"]}<br>\n'
-            
-            if post['notes']:
-                notes_preview = post['notes'][:150] + '...' if len(post['notes']) > 150 else post['notes']
-                html += f'    <strong>Notes:</strong> {notes_preview}<br>\n'
-            
-            html += '  </div>\n'
-            html += '</div>\n'
-    
-    # Footer
-    html += """
-        <div class="footer">
-            <p>This report was automatically generated from Airtable data.</p>
-            <p>To update the data, please visit your <a href="https://airtable.com/appfjLaSUBn8FUYYz/tblrH6OO1ulOnDS4S">Airtable Base</a></p>
-        </div>
-    </body>
-    </html>
-    """
-    
-    return html
+        groups.append({
+            'date_str': _format_due_date(date),
+            'days_until': (due_date.date() - today).days,
+            'posts': date_posts
+        })
+    total_posts = len(posts)
+
+    now_str = datetime.now().strftime('%B %d, %Y at %I:%M %p')
+    return _HTML_TEMPLATE.render(
+        generated_at=now_str,
+        total_posts=total_posts,
+        urgent_posts=urgent_posts,
+        not_started=not_started,
+        groups=groups
+    )
 
 def create_plain_text_email(posts):
     """Create plain text formatted email content."""
-    # Group posts by date
-    posts_by_date = defaultdict(list)
+    # Tally the summary stats in a single pass; grouping happens below via
+    # groupby since posts arrive sorted by due date
+    urgent_posts = not_started = 0
     for post in posts:
-        posts_by_date[post['due_date']].append(post)
-    
-    # Statistics
+        if post['days_until_due'] <= 2:
+            urgent_posts += 1
+        if post['status'] == 'Not Started':
+            not_started += 1
     total_posts = len(posts)
-    urgent_posts = len([p for p in posts if p['days_until_due'] <= 2])
-    not_started = len([p for p in posts if p['status'] == 'Not Started'])
-    
-    text = "WEEKLY BLOG POST SCHEDULE\n"
-    text += "=" * 60 + "\n\n"
-    text += f"Report Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}\n\n"
     
-    text += "SUMMARY\n"
-    text += "-" * 30 + "\n"
-    text += f"Total Posts Due: {total_posts}\n"
-    text += f"Urgent (≤2 days): {urgent_posts}\n"
-    text += f"Not Started: {not_started}\n\n"
-    
-    # Posts by date
-    for date in sorted(posts_by_date.keys()):
+    # Same list-then-join pattern as create_html_email
+    parts = ["WEEKLY BLOG POST SCHEDULE\n"]
+    parts.append("=" * 60 + "\n\n")
+    parts.append(f"Report Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}\n\n")
+
+    parts.append("SUMMARY\n")
+    parts.append("-" * 30 + "\n")
+    parts.append(f"Total Posts Due: {total_posts}\n")
+    parts.append(f"Urgent (≤2 days): {urgent_posts}\n")
+    parts.append(f"Not Started: {not_started}\n\n")
+
+    # Posts by date — adjacent runs of the already-sorted list
+    today = datetime.now().date()
+    for date, date_posts in groupby(posts, key=itemgetter('due_date')):
         due_date = datetime.fromisoformat(date)
-        date_str = due_date.strftime('%A, %B %d, %Y')
-        days_until = (due_date.date() - datetime.now().date()).days
-        
-        text += "\n" + "=" * 60 + "\n"
-        text += date_str
+        date_str = _format_due_date(date)
+        days_until = (due_date.date() - today).days
+
+        parts.append("\n" + "=" * 60 + "\n")
+        parts.append(date_str)
         if days_until <= 1:
-            text += " [URGENT]"
+            parts.append(" [URGENT]")
         elif days_until <= 2:
-            text += " [DUE SOON]"
-        text += "\n" + "=" * 60 + "\n\n"
-        
-        for i, post in enumerate(posts_by_date[date], 1):
-            text += f"{i}. {post['title']}\n"
-            text += f"   Status: {post['status']}\n"
-            text += f"   Priority: {post['priority']}\n"
-            text += f"   Days Until Due: {post['days_until_due']}\n"
-            
+            parts.append(" [DUE SOON]")
+        parts.append("\n" + "=" * 60 + "\n\n")
+
+        for i, post in enumerate(date_posts, 1):
+            post_parts = [
+                f"{i}. {post['title']}\n",
+                f"   Status: {post['status']}\n",
+                f"   Priority: {post['priority']}\n",
+                f"   Days Until Due: {post['days_until_due']}\n"
+            ]
+
             if post['author'] != 'Unassigned':
-                text += f"   Author: {post['author']}\n"
-            
+                post_parts.append(f"   Author: {post['author']}\n")
+
             if post['category']:
-                text += f"   Category: {post['category']}\n"
-            
+                post_parts.append(f"   Category: {post['category']}\n")
+
             if post['word_count_target']:
-                text += f"   Target Words: {post['word_count_target']}\n"
-            
+                post_parts.append(f"   Target Words: {post['word_count_target']}\n")
+
             if post['notes']:
                 notes_preview = post['notes'][:100] + '...' if len(post['notes']) > 100 else post['notes']
-                text += f"   Notes: {notes_preview}\n"
-            
-            text += "\n"
-    
-    text += "\n" + "-" * 60 + "\n"
-    text += "This report was automatically generated from Airtable data.\n"
-    text += "To update: https://airtable.com/appfjLaSUBn8FUYYz/tblrH6OO1ulOnDS4S\n"
-    
-    return text
+                post_parts.append(f"   Notes: {notes_preview}\n")
+
+            post_parts.append("\n")
+            parts.extend(post_parts)
+
+    parts.append("\n" + "-" * 60 + "\n")
+    parts.append("This report was automatically generated from Airtable data.\n")
+    parts.append("To update: https://airtable.com/appfjLaSUBn8FUYYz/tblrH6OO1ulOnDS4S\n")
+
+    return ''.join(parts)
 
 def save_email_content(html_content, text_content):
     """Save email content to files for review."""
@@ -279,41 +153,38 @@ def save_email_content(html_content, text_content):
     print("   - email_content.html (for HTML email)")
     print("   - email_content.txt (for plain text email)")
 
-def create_email_draft():
-    """Create a draft email with both HTML and plain text parts."""
-    posts = load_blog_posts()
-    
-    # Create email content
-    html_content = create_html_email(posts)
-    text_content = create_plain_text_email(posts)
-    
-    # Save to files
-    save_email_content(html_content, text_content)
-    
-    # Create MIME message
-    msg = MIMEMultipart('alternative')
+def create_email_draft(posts=None, html_content=None, text_content=None):
+    """
+    Create a draft email with both HTML and plain text parts.
+
+    Accepts precomputed content so callers that already rendered the email
+    (like main()) don't pay for a second render.
+    """
+    if posts is None:
+        posts = load_blog_posts()
+
+    # Create email content only if the caller didn't supply it
+    if html_content is None:
+        html_content = create_html_email(posts)
+    if text_content is None:
+        text_content = create_plain_text_email(posts)
+
+    # Build the multipart/alternative structure with the modern API — no
+    # hand-rolled MIMEBase parts or manual base64 encoding
+    msg = EmailMessage()
     msg['Subject'] = f"Weekly Blog Posts Due - {len(posts)} Posts This Week"
     msg['From'] = "your-email@example.com"  # Update this
     msg['To'] = "recipient@example.com"  # Update this
-    
-    # Attach parts
-    text_part = MIMEText(text_content, 'plain')
-    html_part = MIMEText(html_content, 'html')
-    
-    msg.attach(text_part)
-    msg.attach(html_part)
-    
-    # Optionally attach the JSON file
-    with open('blog_posts_due.json', 'rb') as f:
-        attachment = MIMEBase('application', 'json')
-        attachment.set_payload(f.read())
-        encoders.encode_base64(attachment)
-        attachment.add_header(
-            'Content-Disposition',
-            'attachment; filename="blog_posts_due.json"'
-        )
-        msg.attach(attachment)
-    
+
+    msg.set_content(text_content)
+    msg.add_alternative(html_content, subtype='html')
+
+    # Attach the JSON straight from the posts already in memory — no disk
+    # round-trip, and the attachment always matches the rendered content
+    payload = orjson.dumps(posts, option=orjson.OPT_INDENT_2)
+    msg.add_attachment(payload, maintype='application', subtype='json',
+                       filename='blog_posts_due.json')
+
     # Save the complete email message
     with open('email_draft.eml', 'wb') as f:
         f.write(msg.as_bytes())
@@ -323,12 +194,13 @@ def create_email_draft():
     
     return msg
 
-def create_gmail_url(posts):
+def create_gmail_url(posts, text_content=None):
     """Create a Gmail compose URL with the email content."""
     import urllib.parse
-    
-    text_content = create_plain_text_email(posts)
-    
+
+    if text_content is None:
+        text_content = create_plain_text_email(posts)
+
     # Create Gmail compose URL
     subject = f"Weekly Blog Posts Due - {len(posts)} Posts This Week"
     body = text_content[:1900]  # Gmail URL limit
@@ -348,28 +220,42 @@ def create_gmail_url(posts):
 
 def main():
     """Main function to create email-ready content."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Format blog posts for email delivery")
+    parser.add_argument('--save-previews', action='store_true',
+                        help="also write email_content.html/.txt preview files")
+    args = parser.parse_args()
+
     try:
         posts = load_blog_posts()
         print(f"\n📊 Processing {len(posts)} blog posts for email...")
-        
-        # Create and save email content
+
+        # Render the email content exactly once and reuse it below
         html_content = create_html_email(posts)
         text_content = create_plain_text_email(posts)
-        save_email_content(html_content, text_content)
-        
+
+        # Preview files are only useful for a human eyeballing the output;
+        # skip the extra disk writes in the cron/CI path by default
+        if args.save_previews:
+            save_email_content(html_content, text_content)
+
         # Create email draft
-        create_email_draft()
-        
+        create_email_draft(posts, html_content, text_content)
+
         # Create Gmail compose URL
-        create_gmail_url(posts)
-        
+        create_gmail_url(posts, text_content)
+
         print("\n✨ Email formatting complete!")
         print("\nYou can now:")
-        print("1. Open 'email_content.html' in a browser to preview the HTML email")
-        print("2. Copy 'email_content.txt' for plain text email")
+        if args.save_previews:
+            print("1. Open 'email_content.html' in a browser to preview the HTML email")
+            print("2. Copy 'email_content.txt' for plain text email")
         print("3. Open 'email_draft.eml' in your email client")
         print("4. Use the Gmail compose URL to send via Gmail")
-        
+        if not args.save_previews:
+            print("   (re-run with --save-previews to also write the preview files)")
+
     except FileNotFoundError:
         print("❌ Error: blog_posts_due.json not found.")
         print("Please run 'python3 fetch_and_export.py' first.")
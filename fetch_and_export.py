@@ -3,6 +3,8 @@
 Non-interactive version of the Airtable blog fetcher that automatically exports to JSON.
 """
 
+import sys
+
 from airtable_blog_fetcher import AirtableBlogFetcher
 
 def main():
@@ -15,8 +17,8 @@ def main():
         print("🔍 Fetching blog posts from Airtable...")
         posts = fetcher.get_posts_due_this_week()
         
-        # Display the results
-        fetcher.display_posts(posts)
+        # Display the results (summary only when piped to a log)
+        fetcher.display_posts(posts, quiet=not sys.stdout.isatty())
         
         # Automatically export to JSON
         if posts:
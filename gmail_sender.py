@@ -4,20 +4,63 @@ Send blog post reports via Gmail using Google Workspace.
 Supports both App Passwords and OAuth2 authentication.
 """
 
+import functools
 import os
 import json
-import smtplib
-import ssl
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
 from datetime import datetime
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email import encoders
-from dotenv import load_dotenv
-from email_formatter import create_html_email, create_plain_text_email, load_blog_posts
+from typing import Optional
 
-# Load environment variables
-load_dotenv()
+# smtplib, ssl, the email.* machinery, dotenv, and email_formatter (which
+# pulls in Jinja2) are imported lazily where used — they account for most of
+# this script's startup time, which the help/test paths shouldn't pay.
+
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:  # stdlib fallback, same semantics
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps(obj):
+        return json.dumps(obj, separators=(',', ':'))
+
+def _load_env():
+    """Load .env only if the environment doesn't already carry credentials.
+
+    Cron/CI injects the variables directly, so those runs skip the dotenv
+    parser entirely.
+    """
+    if os.getenv('GMAIL_SENDER_EMAIL'):
+        return
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+@dataclass(frozen=True)
+class _GmailConfig:
+    """Snapshot of the GMAIL_* environment variables."""
+    sender_email: Optional[str]
+    sender_password: Optional[str]
+    sender_name: str
+
+
+@functools.lru_cache(maxsize=1)
+def _cfg():
+    """Read the Gmail configuration once per process."""
+    _load_env()
+    return _GmailConfig(
+        sender_email=os.getenv('GMAIL_SENDER_EMAIL'),
+        sender_password=os.getenv('GMAIL_APP_PASSWORD'),  # App Password, not regular password
+        sender_name=os.getenv('GMAIL_SENDER_NAME', 'Blog Report System')
+    )
 
 
 class GmailSender:
@@ -26,12 +69,13 @@ class GmailSender:
     def __init__(self):
         """Initialize Gmail sender with credentials from environment."""
         self.smtp_server = "smtp.gmail.com"
-        self.port = 587  # For TLS
-        
-        # Get credentials from environment
-        self.sender_email = os.getenv('GMAIL_SENDER_EMAIL')
-        self.sender_password = os.getenv('GMAIL_APP_PASSWORD')  # App Password, not regular password
-        self.sender_name = os.getenv('GMAIL_SENDER_NAME', 'Blog Report System')
+        self.port = 465  # Implicit TLS (SMTPS)
+
+        # Get credentials from the cached config snapshot
+        cfg = _cfg()
+        self.sender_email = cfg.sender_email
+        self.sender_password = cfg.sender_password
+        self.sender_name = cfg.sender_name
         
         if not self.sender_email or not self.sender_password:
             raise ValueError(
@@ -39,89 +83,174 @@ class GmailSender:
                 "Note: You must use an App Password, not your regular Gmail password.\n"
                 "See: https://support.google.com/accounts/answer/185833"
             )
+
+        # Per-message constants, evaluated once instead of per recipient
+        self._attach_json = os.getenv('GMAIL_ATTACH_JSON', 'false').lower() == 'true'
+        self._from_header = f"{self.sender_name} <{self.sender_email}>"
+
+        # Posts and rendered bodies, loaded lazily on the first
+        # create_message call and reused for every recipient after that
+        self._posts = None
+        self._html = None
+        self._text = None
+        self._json_attachment = None  # (filename, payload), read once per batch
+
+        # Shared SSLContext, built on first connect — loading the CA bundle
+        # is the expensive part of create_default_context and it's identical
+        # for every connection
+        self._ssl_ctx = None
+
+        # Serializes send-log writes when workers send in parallel
+        self._log_lock = threading.Lock()
+        self._log_buffer = []
+        self._batch_mode = False
     
-    def create_message(self, recipient_email, subject=None, cc_emails=None, bcc_emails=None):
+    @staticmethod
+    def _normalize_addrs(addrs):
+        """Normalize None / single string / iterable input to a tuple."""
+        if not addrs:
+            return ()
+        if isinstance(addrs, str):
+            return (addrs,)
+        return tuple(addrs)
+
+    def _connect(self):
+        """Open and authenticate a new SMTP session.
+
+        Connects over implicit TLS (port 465), which saves the extra
+        EHLO/STARTTLS round-trip that the 587 handshake needs before the
+        connection is encrypted.
+        """
+        import smtplib
+        import ssl
+
+        if self._ssl_ctx is None:
+            self._ssl_ctx = ssl.create_default_context()
+        server = smtplib.SMTP_SSL(self.smtp_server, self.port,
+                                  context=self._ssl_ctx, timeout=30)
+        server.login(self.sender_email, self.sender_password)
+        return server
+
+    @contextmanager
+    def _open_connection(self):
+        """Yield an authenticated SMTP session, closing it on exit."""
+        server = self._connect()
+        try:
+            yield server
+        finally:
+            try:
+                server.quit()
+            except Exception:
+                pass
+
+    def create_message(self, recipient_email, subject=None, cc_emails=None, bcc_emails=None,
+                       date_hdr=None, date_tag=None):
         """
         Create the email message with blog post content.
-        
+
         Args:
-            recipient_email: Primary recipient email address
+            recipient_email: Primary recipient email address, or None to
+                build a template message with no To header (the batch paths
+                serialize it once and prepend To per recipient)
             subject: Optional custom subject line
             cc_emails: Optional list of CC recipients
             bcc_emails: Optional list of BCC recipients
+            date_hdr: Optional precomputed RFC 2822 Date header value
+            date_tag: Optional precomputed YYYYMMDD tag for the attachment name
         """
-        # Load blog posts
-        posts = load_blog_posts()
-        
-        # Create content
-        html_content = create_html_email(posts)
-        text_content = create_plain_text_email(posts)
-        
-        # Count statistics for subject
-        urgent_count = len([p for p in posts if p['days_until_due'] <= 2])
+        from email import policy
+        from email.message import EmailMessage
+        from email.utils import formatdate
+        from email_formatter import create_html_email, create_plain_text_email, load_blog_posts
+
+        if date_hdr is None:
+            date_hdr = formatdate(localtime=True)
+        if date_tag is None:
+            date_tag = datetime.now().strftime('%Y%m%d')
+        # Load and render once per process — a batch send re-reads nothing
+        if self._posts is None:
+            self._posts = load_blog_posts()
+            self._html = create_html_email(self._posts)
+            self._text = create_plain_text_email(self._posts)
+
+        posts = self._posts
+        html_content = self._html
+        text_content = self._text
         
-        # Create message
-        msg = MIMEMultipart('alternative')
+        # Count statistics for subject — generator form, no throwaway list
+        urgent_count = sum(1 for p in posts if p['days_until_due'] <= 2)
         
+        # Create message — the modern EmailMessage API with the SMTP policy
+        # builds the multipart/alternative tree with fewer intermediate
+        # objects and serializes through the optimized BytesGenerator path
+        msg = EmailMessage(policy=policy.SMTP)
+
         # Set headers
         if not subject:
             if urgent_count > 0:
                 subject = f"🔴 {urgent_count} URGENT Posts Due - Weekly Blog Schedule ({len(posts)} total)"
             else:
                 subject = f"Weekly Blog Schedule - {len(posts)} Posts Due This Week"
-        
+
         msg['Subject'] = subject
-        msg['From'] = f"{self.sender_name} <{self.sender_email}>"
-        msg['To'] = recipient_email
-        msg['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
-        
+        msg['From'] = self._from_header
+        if recipient_email:
+            msg['To'] = recipient_email
+        # formatdate emits a proper RFC 2822 date with timezone — strftime's
+        # %z on a naive datetime produced an empty offset
+        msg['Date'] = date_hdr
+
         # Add CC if provided
+        cc_emails = self._normalize_addrs(cc_emails)
         if cc_emails:
-            if isinstance(cc_emails, list):
-                msg['Cc'] = ', '.join(cc_emails)
-            else:
-                msg['Cc'] = cc_emails
-        
+            msg['Cc'] = ', '.join(cc_emails)
+
         # Add custom headers
         msg['X-Priority'] = '2' if urgent_count > 5 else '3'  # High priority if many urgent posts
         msg['X-Mailer'] = 'Blog Post Reporter via Python'
-        
+
         # Attach text and HTML parts
-        text_part = MIMEText(text_content, 'plain')
-        html_part = MIMEText(html_content, 'html')
-        
-        msg.attach(text_part)
-        msg.attach(html_part)
-        
-        # Optionally attach JSON data
-        if os.getenv('GMAIL_ATTACH_JSON', 'false').lower() == 'true':
-            with open('blog_posts_due.json', 'rb') as f:
-                attachment = MIMEBase('application', 'json')
-                attachment.set_payload(f.read())
-                encoders.encode_base64(attachment)
-                attachment.add_header(
-                    'Content-Disposition',
-                    f'attachment; filename="blog_posts_{datetime.now().strftime("%Y%m%d")}.json"'
-                )
-                msg.attach(attachment)
-        
+        msg.set_content(text_content)
+        msg.add_alternative(html_content, subtype='html')
+
+        # Optionally attach JSON data — the file is read once and the bytes
+        # shared across every message in a batch
+        if self._attach_json:
+            if self._json_attachment is None:
+                with open('blog_posts_due.json', 'rb') as f:
+                    self._json_attachment = (f'blog_posts_{date_tag}.json', f.read())
+            filename, payload = self._json_attachment
+            msg.add_attachment(payload, maintype='application', subtype='json',
+                               filename=filename)
+
         return msg, posts
     
-    def send_email(self, recipient_email, subject=None, cc_emails=None, bcc_emails=None, test_mode=False):
+    def send_email(self, recipient_email, subject=None, cc_emails=None, bcc_emails=None,
+                   test_mode=False, server=None, date_hdr=None, date_tag=None):
         """
         Send the email via Gmail SMTP.
-        
+
         Args:
             recipient_email: Primary recipient
             subject: Optional custom subject
             cc_emails: Optional CC recipients
             bcc_emails: Optional BCC recipients
             test_mode: If True, prepare but don't send
+            server: Optional pre-opened SMTP session to reuse; when absent a
+                connection is opened and closed for this send
         """
+        import smtplib
+
+        # Normalize once at the public boundary; everything below works with
+        # tuples unconditionally
+        cc_emails = self._normalize_addrs(cc_emails)
+        bcc_emails = self._normalize_addrs(bcc_emails)
+
         try:
             # Create message
-            msg, posts = self.create_message(recipient_email, subject, cc_emails, bcc_emails)
-            
+            msg, posts = self.create_message(recipient_email, subject, cc_emails, bcc_emails,
+                                             date_hdr=date_hdr, date_tag=date_tag)
+
             if test_mode:
                 print("📧 TEST MODE - Email prepared but not sent")
                 print(f"   From: {msg['From']}")
@@ -131,48 +260,33 @@ class GmailSender:
                 print(f"   Subject: {msg['Subject']}")
                 print(f"   Posts included: {len(posts)}")
                 return True
-            
-            # Create secure SSL context
-            context = ssl.create_default_context()
-            
-            # Connect and send
-            print(f"📧 Connecting to Gmail SMTP server...")
-            
-            with smtplib.SMTP(self.smtp_server, self.port) as server:
-                server.starttls(context=context)
-                server.login(self.sender_email, self.sender_password)
-                
-                # Prepare all recipients
-                recipients = [recipient_email]
-                if cc_emails:
-                    if isinstance(cc_emails, list):
-                        recipients.extend(cc_emails)
-                    else:
-                        recipients.append(cc_emails)
-                if bcc_emails:
-                    if isinstance(bcc_emails, list):
-                        recipients.extend(bcc_emails)
-                    else:
-                        recipients.append(bcc_emails)
-                
-                # Send email
+
+            # Prepare all recipients
+            recipients = [recipient_email, *cc_emails, *bcc_emails]
+
+            # Send on the shared session when the caller provides one
+            if server is not None:
                 server.send_message(msg, to_addrs=recipients)
-                
-                print(f"✅ Email sent successfully!")
-                print(f"   From: {self.sender_email}")
-                print(f"   To: {recipient_email}")
-                if cc_emails:
-                    print(f"   CC: {cc_emails}")
-                if bcc_emails:
-                    print(f"   BCC: {bcc_emails}")
-                print(f"   Subject: {msg['Subject']}")
-                print(f"   Posts included: {len(posts)}")
-                
-                # Log the send
-                self._log_send(recipient_email, len(posts))
-                
-                return True
-                
+            else:
+                print(f"📧 Connecting to Gmail SMTP server...")
+                with self._open_connection() as conn:
+                    conn.send_message(msg, to_addrs=recipients)
+
+            print(f"✅ Email sent successfully!")
+            print(f"   From: {self.sender_email}")
+            print(f"   To: {recipient_email}")
+            if cc_emails:
+                print(f"   CC: {cc_emails}")
+            if bcc_emails:
+                print(f"   BCC: {bcc_emails}")
+            print(f"   Subject: {msg['Subject']}")
+            print(f"   Posts included: {len(posts)}")
+
+            # Log the send
+            self._log_send(recipient_email, len(posts))
+
+            return True
+
         except smtplib.SMTPAuthenticationError:
             print("❌ Authentication failed!")
             print("   Please check:")
@@ -191,60 +305,285 @@ class GmailSender:
             return False
     
     def _log_send(self, recipient, post_count):
-        """Log successful email sends."""
-        log_file = 'email_send_log.json'
-        
-        # Load existing log or create new
-        if os.path.exists(log_file):
-            with open(log_file, 'r') as f:
-                log = json.load(f)
-        else:
-            log = []
-        
-        # Add new entry
-        log.append({
+        """Log a successful send by appending one JSON line."""
+        entry = {
             'timestamp': datetime.now().isoformat(),
             'recipient': recipient,
             'post_count': post_count,
             'sender': self.sender_email
-        })
-        
-        # Save log
-        with open(log_file, 'w') as f:
-            json.dump(log, f, indent=2)
+        }
+
+        # In batch mode, buffer the entry; send_to_multiple flushes once at
+        # the end instead of opening the file per recipient
+        if self._batch_mode:
+            self._log_buffer.append(entry)
+            return
+
+        with self._log_lock:
+            self._migrate_log()
+            with open('email_send_log.jsonl', 'a') as f:
+                f.write(_json_dumps(entry) + '\n')
+
+    @contextmanager
+    def _batched_logging(self):
+        """Buffer send-log entries for the enclosed block, then flush once."""
+        self._batch_mode = True
+        try:
+            yield
+        finally:
+            self._batch_mode = False
+            self._flush_log()
+
+    def _flush_log(self):
+        """Write all buffered log entries in a single append."""
+        with self._log_lock:
+            if not self._log_buffer:
+                return
+            self._migrate_log()
+            with open('email_send_log.jsonl', 'a') as f:
+                f.writelines(_json_dumps(e) + '\n'
+                             for e in self._log_buffer)
+            self._log_buffer.clear()
+
+    def _migrate_log(self):
+        """One-time conversion of the legacy JSON-array log to JSON Lines."""
+        legacy = 'email_send_log.json'
+        if not os.path.exists(legacy):
+            return
+
+        try:
+            with open(legacy, 'r') as f:
+                entries = _json_loads(f.read())
+            with open('email_send_log.jsonl', 'a') as f:
+                for entry in entries:
+                    f.write(_json_dumps(entry) + '\n')
+            os.remove(legacy)
+            print(f"📄 Migrated {len(entries)} send log entries to email_send_log.jsonl")
+        except (ValueError, OSError) as e:
+            print(f"⚠️  Could not migrate legacy send log: {e}")
     
-    def send_to_multiple(self, recipients, subject=None):
+    def send_to_multiple(self, recipients, subject=None, messages_per_connection=100,
+                         pool_size=None):
         """
-        Send to multiple recipients individually.
-        
+        Send to multiple recipients in parallel over pooled SMTP connections.
+
+        SMTP is I/O-bound, so a few concurrent connections give near-linear
+        speedup up to Gmail's limits.
+
         Args:
             recipients: List of email addresses
             subject: Optional custom subject
+            messages_per_connection: Rotate a session after this many sends
+                to stay under Gmail's per-connection limits
+            pool_size: Number of parallel connections; defaults to the
+                GMAIL_POOL_SIZE env var (3) capped at the recipient count
         """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from email.utils import formatdate, parseaddr
+        from queue import Queue
+
         successful = []
         failed = []
-        
-        for recipient in recipients:
-            print(f"\n📧 Sending to {recipient}...")
-            if self.send_email(recipient, subject):
+
+        # Strip, dedupe (order-preserving), and reject malformed addresses
+        # locally — a bad address costs microseconds here versus an SMTP
+        # round-trip rejection per message later
+        deduped = list(dict.fromkeys(r.strip() for r in recipients if r.strip()))
+        recipients = []
+        for r in deduped:
+            if '@' in parseaddr(r)[1]:
+                recipients.append(r)
+            else:
+                print(f"⚠️  Skipping invalid address: {r}")
+                failed.append(r)
+
+        if not recipients:
+            return successful, failed
+
+        if pool_size is None:
+            pool_size = int(os.getenv('GMAIL_POOL_SIZE', '3'))
+        pool_size = max(1, min(pool_size, len(recipients)))
+
+        # Pre-authenticated connections shared by the workers
+        connections = Queue()
+        try:
+            print(f"\n📧 Opening {pool_size} Gmail SMTP connection(s)...")
+            for _ in range(pool_size):
+                connections.put(self._connect())
+        except Exception as e:
+            print(f"❌ Connection error: {e}")
+            return [], list(recipients)
+
+        # One locale-aware timestamp pair for the whole batch
+        now = datetime.now()
+        date_hdr = formatdate(now.timestamp(), localtime=True)
+        date_tag = now.strftime('%Y%m%d')
+
+        # Every recipient gets byte-identical content, so build and
+        # serialize the MIME tree exactly once; per send only a To header
+        # is prepended to the pre-rendered bytes
+        msg, posts = self.create_message(None, subject,
+                                         date_hdr=date_hdr, date_tag=date_tag)
+        body_bytes = msg.as_bytes()
+        post_count = len(posts)
+
+        send_counts = {}
+
+        def _send_one(recipient):
+            server = connections.get()
+            try:
+                if send_counts.get(id(server), 0) >= messages_per_connection:
+                    try:
+                        server.quit()
+                    except Exception:
+                        pass
+                    server = self._connect()
+                server.sendmail(self.sender_email, [recipient],
+                                b'To: ' + recipient.encode('ascii') + b'\r\n' + body_bytes)
+                send_counts[id(server)] = send_counts.get(id(server), 0) + 1
+                print(f"✅ Email sent to {recipient}")
+                self._log_send(recipient, post_count)
+                return True
+            finally:
+                connections.put(server)
+
+        with self._batched_logging():
+            with ThreadPoolExecutor(max_workers=pool_size) as executor:
+                futures = {executor.submit(_send_one, r): r for r in recipients}
+                for future in as_completed(futures):
+                    recipient = futures[future]
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        print(f"❌ Error sending to {recipient}: {e}")
+                        ok = False
+                    if ok:
+                        successful.append(recipient)
+                    else:
+                        failed.append(recipient)
+
+        # Close whatever connections are still pooled
+        while not connections.empty():
+            try:
+                connections.get_nowait().quit()
+            except Exception:
+                pass
+
+        self._print_send_summary(successful, failed)
+        return successful, failed
+
+    async def send_to_multiple_async(self, recipients, subject=None, pool_size=None):
+        """
+        Send to multiple recipients concurrently on the asyncio event loop.
+
+        aiosmtplib overlaps the SMTP round-trips of all in-flight sends on a
+        single thread — same effect as the thread pool in send_to_multiple
+        without per-send thread overhead. Requires aiosmtplib; callers should
+        fall back to send_to_multiple when it isn't installed.
+
+        Args:
+            recipients: List of email addresses
+            subject: Optional custom subject
+            pool_size: Number of concurrent connections; defaults to the
+                GMAIL_POOL_SIZE env var (3) capped at the recipient count
+        """
+        import asyncio
+        import aiosmtplib
+        from email.utils import formatdate, parseaddr
+
+        successful = []
+        failed = []
+
+        # Same local validation as the sync path
+        deduped = list(dict.fromkeys(r.strip() for r in recipients if r.strip()))
+        recipients = []
+        for r in deduped:
+            if '@' in parseaddr(r)[1]:
+                recipients.append(r)
+            else:
+                print(f"⚠️  Skipping invalid address: {r}")
+                failed.append(r)
+
+        if not recipients:
+            return successful, failed
+
+        if pool_size is None:
+            pool_size = int(os.getenv('GMAIL_POOL_SIZE', '3'))
+        pool_size = max(1, min(pool_size, len(recipients)))
+
+        # Authenticated connections shared by the send tasks
+        connections = asyncio.Queue()
+        try:
+            print(f"\n📧 Opening {pool_size} Gmail SMTP connection(s)...")
+            for _ in range(pool_size):
+                server = aiosmtplib.SMTP(hostname=self.smtp_server, port=self.port,
+                                         use_tls=True)
+                await server.connect()
+                await server.login(self.sender_email, self.sender_password)
+                connections.put_nowait(server)
+        except Exception as e:
+            print(f"❌ Connection error: {e}")
+            return [], list(recipients)
+
+        # One locale-aware timestamp pair for the whole batch
+        now = datetime.now()
+        date_hdr = formatdate(now.timestamp(), localtime=True)
+        date_tag = now.strftime('%Y%m%d')
+
+        # Serialize once, same as the sync batch path
+        msg, posts = self.create_message(None, subject,
+                                         date_hdr=date_hdr, date_tag=date_tag)
+        body_bytes = msg.as_bytes()
+        post_count = len(posts)
+
+        async def _send_one(recipient):
+            server = await connections.get()
+            try:
+                await server.sendmail(self.sender_email, [recipient],
+                                      b'To: ' + recipient.encode('ascii') + b'\r\n' + body_bytes)
+            finally:
+                connections.put_nowait(server)
+            print(f"✅ Email sent to {recipient}")
+            self._log_send(recipient, post_count)
+            return True
+
+        # All tasks run on this one thread, so the log buffer needs no lock
+        with self._batched_logging():
+            results = await asyncio.gather(*(_send_one(r) for r in recipients),
+                                           return_exceptions=True)
+
+        for recipient, result in zip(recipients, results):
+            if result is True:
                 successful.append(recipient)
             else:
+                if isinstance(result, Exception):
+                    print(f"❌ Error sending to {recipient}: {result}")
                 failed.append(recipient)
-        
-        # Summary
+
+        # Close the pooled connections
+        while not connections.empty():
+            try:
+                await connections.get_nowait().quit()
+            except Exception:
+                pass
+
+        self._print_send_summary(successful, failed)
+        return successful, failed
+
+    @staticmethod
+    def _print_send_summary(successful, failed):
+        """Print the batch sending summary."""
         print("\n" + "=" * 50)
         print("📊 SENDING SUMMARY")
         print("=" * 50)
         print(f"✅ Successful: {len(successful)}")
         for email in successful:
             print(f"   • {email}")
-        
+
         if failed:
             print(f"\n❌ Failed: {len(failed)}")
             for email in failed:
                 print(f"   • {email}")
-        
-        return successful, failed
 
 
 def interactive_send():
@@ -308,9 +647,16 @@ def automated_send():
             return
         
         print(f"📧 Automated sending to {len(recipients)} recipient(s)")
-        
-        # Send to all recipients
-        sender.send_to_multiple(recipients)
+
+        # Pipeline the sends on the event loop when aiosmtplib is available;
+        # otherwise use the threaded sync path
+        try:
+            import aiosmtplib  # noqa: F401
+        except ImportError:
+            sender.send_to_multiple(recipients)
+        else:
+            import asyncio
+            asyncio.run(sender.send_to_multiple_async(recipients))
         
     except Exception as e:
         print(f"❌ Error in automated send: {e}")
@@ -4,13 +4,40 @@ Examples of parsing and working with the blog posts JSON file.
 """
 
 import json
+import operator
 from datetime import datetime
-from collections import defaultdict
+from itertools import groupby
 
-def load_blog_posts(filename="blog_posts_due.json"):
-    """Load blog posts from JSON file."""
-    with open(filename, 'r') as f:
-        return json.load(f)
+try:
+    import orjson
+
+    def _json_loads(data):
+        return orjson.loads(data)
+
+    def _json_dumps_indented(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str)
+except ImportError:  # stdlib fallback, same semantics
+    def _json_loads(data):
+        return json.loads(data)
+
+    def _json_dumps_indented(obj):
+        return json.dumps(obj, indent=2, default=str).encode()
+
+def load_blog_posts(filename="blog_posts_due.json", as_dataframe=False):
+    """Load blog posts from JSON file.
+
+    Args:
+        filename: Path to the JSON export
+        as_dataframe: Return a pandas DataFrame instead of a list of dicts.
+            DataFrame columns support C-vectorized filtering and groupby
+            instead of per-dict Python loops. Requires pandas.
+    """
+    with open(filename, 'rb') as f:
+        posts = _json_loads(f.read())
+    if as_dataframe:
+        import pandas as pd
+        return pd.DataFrame(posts)
+    return posts
 
 def example_1_basic_parsing():
     """Example 1: Basic parsing - print all titles."""
@@ -41,16 +68,16 @@ def example_3_group_by_date():
     print("=" * 50)
     
     posts = load_blog_posts()
-    
-    # Group by due date
-    posts_by_date = defaultdict(list)
-    for post in posts:
-        posts_by_date[post['due_date']].append(post)
-    
+
+    # ISO date strings sort chronologically, so one sort + groupby walks the
+    # adjacent runs — no defaultdict hashing and no separate key re-sort
+    posts.sort(key=operator.itemgetter('due_date'))
+
     # Display grouped posts
-    for date in sorted(posts_by_date.keys()):
-        print(f"\n📌 {date} ({len(posts_by_date[date])} posts):")
-        for post in posts_by_date[date]:
+    for date, group in groupby(posts, key=operator.itemgetter('due_date')):
+        group = list(group)
+        print(f"\n📌 {date} ({len(group)} posts):")
+        for post in group:
             print(f"  • {post['title']}")
 
 def example_4_priority_posts():
@@ -60,11 +87,11 @@ def example_4_priority_posts():
     
     posts = load_blog_posts()
     
-    # Filter not started posts
-    not_started = [p for p in posts if p['status'] == 'Not Started']
-    print(f"\nNot Started: {len(not_started)} posts")
-    
-    # Filter by days until due
+    # Count not-started posts without materializing a list
+    not_started = sum(1 for p in posts if p['status'] == 'Not Started')
+    print(f"\nNot Started: {not_started} posts")
+
+    # Filter by days until due (kept as a list — the titles are shown below)
     urgent = [p for p in posts if p['days_until_due'] <= 2]
     print(f"Urgent (≤2 days): {len(urgent)} posts")
     
@@ -84,8 +111,8 @@ def example_5_export_subset():
     urgent_posts = [p for p in posts if p['days_until_due'] <= 2]
     
     # Export to new file
-    with open('urgent_posts.json', 'w') as f:
-        json.dump(urgent_posts, f, indent=2, default=str)
+    with open('urgent_posts.json', 'wb') as f:
+        f.write(_json_dumps_indented(urgent_posts))
     
     print(f"Exported {len(urgent_posts)} urgent posts to 'urgent_posts.json'")
 
@@ -95,31 +122,34 @@ def example_6_create_markdown():
     print("=" * 50)
     
     posts = load_blog_posts()
-    
-    # Group by date
-    posts_by_date = defaultdict(list)
-    for post in posts:
-        posts_by_date[post['due_date']].append(post)
-    
-    # Create markdown content
-    markdown = "# Blog Posts Due This Week\n\n"
-    markdown += f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*\n\n"
-    markdown += f"**Total Posts:** {len(posts)}\n\n"
-    
-    for date in sorted(posts_by_date.keys()):
+
+    # Sort once and group adjacent runs, parsing each date a single time
+    posts.sort(key=operator.itemgetter('due_date'))
+
+    # Collect fragments and join once — += inside the post loop re-copies
+    # the whole report on every append
+    parts = []
+    append = parts.append
+    append("# Blog Posts Due This Week\n\n")
+    append(f"*Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*\n\n")
+    append(f"**Total Posts:** {len(posts)}\n\n")
+
+    for date, group in groupby(posts, key=operator.itemgetter('due_date')):
         due_date = datetime.fromisoformat(date)
-        markdown += f"## {due_date.strftime('%A, %B %d, %Y')}\n\n"
-        
-        for post in posts_by_date[date]:
-            markdown += f"### {post['title']}\n"
-            markdown += f"- **Status:** {post['status']}\n"
-            markdown += f"- **Priority:** {post['priority']}\n"
+        append(f"## {due_date.strftime('%A, %B %d, %Y')}\n\n")
+
+        for post in group:
+            append(f"### {post['title']}\n")
+            append(f"- **Status:** {post['status']}\n")
+            append(f"- **Priority:** {post['priority']}\n")
             if post['word_count_target']:
-                markdown += f"- **Target Words:** {post['word_count_target']}\n"
+                append(f"- **Target Words:** {post['word_count_target']}\n")
             if post['notes']:
-                markdown += f"- **Notes:** {post['notes'][:100]}...\n"
-            markdown += "\n"
-    
+                append(f"- **Notes:** {post['notes'][:100]}...\n")
+            append("\n")
+
+    markdown = ''.join(parts)
+
     # Save to file
     with open('blog_posts_report.md', 'w') as f:
         f.write(markdown)
@@ -133,24 +163,60 @@ def example_7_csv_export():
     print("\n📊 EXAMPLE 7: Export to CSV")
     print("=" * 50)
     
-    import csv
-    
     posts = load_blog_posts()
-    
+
     # Define CSV columns
-    fieldnames = ['title', 'due_date', 'days_until_due', 'status', 'priority', 
+    fieldnames = ['title', 'due_date', 'days_until_due', 'status', 'priority',
                   'author', 'category', 'word_count_target']
-    
-    # Write CSV
-    with open('blog_posts.csv', 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
-        
-        writer.writeheader()
-        writer.writerows(posts)
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
+    if pd is not None:
+        # to_csv writes through a C-level buffered writer with type-specific
+        # formatters; reindex supplies NaN for any missing column
+        pd.DataFrame(posts).reindex(columns=fieldnames).to_csv(
+            'blog_posts.csv', index=False)
+    else:
+        import csv
+        from collections import ChainMap
+
+        # itemgetter grabs all eight fields in one C call per row; the
+        # ChainMap backstop supplies None for any key a post is missing
+        defaults = dict.fromkeys(fieldnames)
+        getter = operator.itemgetter(*fieldnames)
+
+        with open('blog_posts.csv', 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
+            writer.writerows(getter(ChainMap(p, defaults)) for p in posts)
     
     print(f"Exported {len(posts)} posts to 'blog_posts.csv'")
     print("You can open this in Excel, Google Sheets, etc.")
 
+def example_8_dataframe():
+    """Example 8: Vectorized analysis with pandas (optional)."""
+    print("\n🐼 EXAMPLE 8: Pandas DataFrame Analysis")
+    print("=" * 50)
+
+    try:
+        df = load_blog_posts(as_dataframe=True)
+    except ImportError:
+        print("pandas not installed — skipping (pip install pandas)")
+        return
+
+    # Each boolean mask is a single C-level pass over the column instead of
+    # a Python loop dereferencing dict keys
+    print(f"Due tomorrow: {(df['days_until_due'] == 1).sum()} posts")
+    print(f"Urgent (≤2 days): {(df['days_until_due'] <= 2).sum()} posts")
+    print(f"Not Started: {(df['status'] == 'Not Started').sum()} posts")
+
+    print("\nPosts per due date:")
+    for date, count in df.groupby('due_date').size().items():
+        print(f"  {date}: {count}")
+
 def main():
     """Run all examples."""
     try:
@@ -166,7 +232,8 @@ def main():
         example_5_export_subset()
         example_6_create_markdown()
         example_7_csv_export()
-        
+        example_8_dataframe()
+
         print("\n" + "=" * 50)
         print("✨ All examples completed successfully!")
         